@@ -17,10 +17,15 @@ Usage:
     uv run bridge.py                        # auto-detect serial port
     uv run bridge.py /dev/cu.usbserial-10   # specify port
     uv run bridge.py COM3                   # Windows
+    uv run bridge.py --no-crc               # skip frame checksum validation
+    uv run bridge.py --verbose              # log TX bytes (no TUI)
+    uv run bridge.py --no-influx            # don't prompt for InfluxDB
+    uv run bridge.py --ws-port 8765         # listen on another port
 
 The web app connects to ws://localhost:8767 (default).
 """
 
+import argparse
 import asyncio
 import datetime
 import getpass
@@ -29,17 +34,35 @@ import shutil
 import signal
 import struct
 import sys
+import threading
+import time
 
 import serial
 import serial.tools.list_ports
 import websockets
 
+try:
+    from influxdb_client import InfluxDBClient, WriteOptions, WritePrecision
+    _HAS_INFLUX = True
+except ImportError:
+    _HAS_INFLUX = False
+
 
 BAUD_RATE = 9600
 WS_HOST = "localhost"
 WS_PORT = 8767
+READ_CHUNK = 4096    # max bytes forwarded per WebSocket frame
+READ_SETTLE = 0.005  # quiet gap (~5 byte times at 9600 baud) that ends a read
 TUI_ROWS = 10  # fixed terminal rows used by TUI (passive: no command input)
 
+# TA612C frame constants
+_HEADER = b"\x55\xAA"           # device→PC frame header
+_S_4I16 = struct.Struct("<4h")  # real-time payload: 4 × 16-bit LE signed temps
+# Valid raw range (×0.1 °C); anything outside means an open thermocouple
+_RAW_MIN, _RAW_MAX = -3000, 20000
+_VERIFY_CHECKSUM = True  # cleared by --no-crc
+_LOG_TX = False          # set by --verbose
+
 # ─────────────────────────────────────────────────────────────────────────────
 # USER CONFIGURATION
 # Hard-code values here to skip the interactive prompts at startup.
@@ -55,6 +78,8 @@ INFLUXDB_MEASUREMENT = None   # e.g. "ta612c_lab1"
 
 # InfluxDB state (set by setup_influxdb)
 _influx = None  # dict with write_api, bucket, org, measurement, client
+_influx_q = None  # asyncio.Queue of (time_ns, temps) drained by influx_consumer()
+_influx_task = None  # influx_consumer() task, kept referenced while running
 
 # ─────────────────────────────────────────────────────────────────────────────
 # TUI STATE
@@ -142,7 +167,7 @@ def tui_start(transport_desc, influx_desc):
     sys.stdout.flush()
     tui_draw()
 
-    _tui_loop = asyncio.get_event_loop()
+    _tui_loop = asyncio.get_running_loop()
     try:
         _tui_loop.add_signal_handler(signal.SIGWINCH,
                                      lambda: (tui_draw(), sys.stdout.flush()))
@@ -281,6 +306,10 @@ def tui_update_client(peer, connected):
 # DEVICE DETECTION
 # ─────────────────────────────────────────────────────────────────────────────
 
+# Device-name substrings of USB serial adapters (Linux ttyUSB/ttyACM, macOS cu.*)
+_USB_NAME_HINTS = ("ttyusb", "ttyacm", "cu.usb", "cu.wch")
+
+
 def _is_usb_port(p):
     """Return True if this port looks like a USB serial device.
 
@@ -293,7 +322,7 @@ def _is_usb_port(p):
     if p.vid is not None:
         return True
     name = p.device.lower()
-    return any(s in name for s in ("ttyusb", "ttyacm", "cu.usb", "cu.wch"))
+    return any(s in name for s in _USB_NAME_HINTS)
 
 
 def find_serial_port():
@@ -307,13 +336,14 @@ def find_serial_port():
     if not all_ports:
         return None
 
-    usb_ports = [p for p in all_ports if _is_usb_port(p)]
+    usb_flags = {p.device: _is_usb_port(p) for p in all_ports}
+    usb_ports = [p for p in all_ports if usb_flags[p.device]]
     ports = usb_ports if usb_ports else all_ports
     if not usb_ports:
         print("No USB serial devices found — showing all ports:")
 
     if len(ports) == 1:
-        tag = " [USB]" if _is_usb_port(ports[0]) else ""
+        tag = " [USB]" if usb_flags[ports[0].device] else ""
         print(f"Found serial port: {ports[0].device}{tag}  —  {ports[0].description}")
         return ports[0].device
 
@@ -355,10 +385,20 @@ def open_serial(port_name):
 # INFLUXDB
 # ─────────────────────────────────────────────────────────────────────────────
 
+def _influx_write_error(conf, data, exception):
+    """Report a failed batch write (called from the InfluxDB writer thread)."""
+    if not _tui_active:
+        print(f"  InfluxDB write error: {exception}")
+
+
 def setup_influxdb():
     """Interactively configure InfluxDB logging. Returns config dict or None."""
     global _influx
 
+    if not _HAS_INFLUX:
+        print("\ninfluxdb-client not installed — InfluxDB logging disabled.")
+        return None
+
     # Use pre-configured values if all USER CONFIGURATION fields are set
     if all([INFLUXDB_URL, INFLUXDB_ORG, INFLUXDB_BUCKET, INFLUXDB_TOKEN, INFLUXDB_MEASUREMENT]):
         url = INFLUXDB_URL
@@ -389,8 +429,6 @@ def setup_influxdb():
             print("Missing required fields — InfluxDB logging disabled.")
             return None
 
-    from influxdb_client import InfluxDBClient
-
     print("\nTesting connection... ", end="", flush=True)
     client = InfluxDBClient(url=url, token=token, org=org)
     try:
@@ -405,14 +443,25 @@ def setup_influxdb():
         return None
     print("✓")
 
-    from influxdb_client.client.write_api import SYNCHRONOUS
-    write_api = client.write_api(write_options=SYNCHRONOUS)
+    # Batching write API: points are queued and flushed from a background
+    # thread, so writes never block the serial/WebSocket event loop.
+    write_api = client.write_api(
+        write_options=WriteOptions(
+            batch_size=500,
+            flush_interval=1000,
+            jitter_interval=0,
+            retry_interval=5000,
+        ),
+        error_callback=_influx_write_error,
+    )
     _influx = {
         "client": client,
         "write_api": write_api,
         "bucket": bucket,
         "org": org,
         "measurement": measurement,
+        # Line-protocol measurement (commas/spaces escaped) + separator
+        "line_prefix": measurement.replace(",", "\\,").replace(" ", "\\ ") + " ",
     }
     print(f"InfluxDB logging enabled → {org}/{bucket}/{measurement}\n")
     return _influx
@@ -436,140 +485,202 @@ def close_influxdb():
 # PROTOCOL
 # ─────────────────────────────────────────────────────────────────────────────
 
-def parse_ta612c_frames(buf):
-    """Parse TA612C binary frames from buffer.
+def _scan_ta612c_frames(buf, on_reading):
+    """Parse TA612C binary frames from buffer, streaming each reading.
 
     Scans for device→PC header (0x55 0xAA), validates length and checksum,
-    extracts 4-channel temperatures from cmd 0x01 (real-time data) frames.
+    and calls on_reading((t1, t2, t3, t4)) in °C for every cmd 0x01
+    (real-time data) frame as soon as it is decoded.
 
-    Returns (readings, remaining_buffer) where readings is a list of
-    (t1, t2, t3, t4) tuples in °C.
+    Returns the number of leading bytes of buf that have been processed
+    and can be discarded.
     """
-    readings = []
-    while True:
-        # Find device→PC header
-        idx = -1
-        for i in range(len(buf) - 1):
-            if buf[i] == 0x55 and buf[i + 1] == 0xAA:
-                idx = i
+    find = buf.find
+    unpack = _S_4I16.unpack_from
+    verify = _VERIFY_CHECKSUM
+    pos = 0
+    end = len(buf)
+    # Zero-copy view for checksums; released before returning so the caller
+    # can resize buf
+    with memoryview(buf) as view:
+        while True:
+            # Find device→PC header
+            idx = find(_HEADER, pos)
+            if idx < 0:
+                # Keep last byte in case it's the start of a header
+                pos = max(pos, end - 1)
+                break
+
+            # Discard bytes before header
+            pos = idx
+
+            # Need at least header(2) + cmd(1) + length(1) to read length
+            if end - pos < 4:
+                break
+
+            length = buf[pos + 3]  # total bytes after the 2-byte header (cmd + length + payload + checksum)
+            frame_end = pos + 2 + length
+            if frame_end > end:
                 break
-        if idx < 0:
-            # Keep last byte in case it's the start of a header
-            if len(buf) > 1:
-                buf = buf[-1:]
-            break
-
-        # Discard bytes before header
-        buf = buf[idx:]
-
-        # Need at least header(2) + cmd(1) + length(1) to read length
-        if len(buf) < 4:
-            break
-
-        length = buf[3]  # total bytes after the 2-byte header (cmd + length + payload + checksum)
-        frame_size = 2 + length
-        if len(buf) < frame_size:
-            break
-
-        frame = buf[:frame_size]
-        buf = buf[frame_size:]
-
-        # Validate checksum: low byte of sum of all preceding bytes
-        checksum = sum(frame[:-1]) & 0xFF
-        if checksum != frame[-1]:
-            continue
-
-        cmd = frame[2]
-        if cmd == 0x01:
-            # Real-time data: payload is 4 × 16-bit LE signed temperatures
-            payload = frame[4:-1]  # skip header(2)+cmd(1)+length(1), exclude checksum
-            if len(payload) >= 8:
-                temps = []
-                for ch in range(4):
-                    raw = struct.unpack_from("<h", payload, ch * 2)[0]
-                    temp = raw / 10.0
-                    # Out-of-range values indicate open/disconnected thermocouple
-                    temps.append(temp if -300 <= temp <= 2000 else None)
-                readings.append(tuple(temps))
-
-    return readings, buf
-
-
-def write_influx_temps(temps):
-    """Write a 4-channel temperature reading to InfluxDB."""
+
+            # Validate checksum: low byte of sum of all preceding bytes
+            valid = (not verify
+                     or sum(view[pos:frame_end - 1]) & 0xFF == buf[frame_end - 1])
+            # Real-time data: cmd 0x01 with a payload of at least
+            # 4 × 16-bit LE signed temperatures (length = cmd + length + 8 + checksum)
+            if valid and buf[pos + 2] == 0x01 and length >= 11:
+                # Range-check the raw int16 so out-of-range (open or
+                # disconnected) channels never reach the float divide
+                on_reading(tuple(
+                    raw / 10.0 if _RAW_MIN <= raw <= _RAW_MAX else None
+                    for raw in unpack(buf, pos + 4)
+                ))
+            pos = frame_end
+
+    return pos
+
+
+def parse_ta612c_frames(buf):
+    """Parse TA612C binary frames from buffer.
+
+    Returns (readings, consumed) where readings is a list of
+    (t1, t2, t3, t4) tuples in °C and consumed is the number of leading
+    bytes of buf that have been processed and can be discarded.
+    """
+    readings = []
+    consumed = _scan_ta612c_frames(buf, readings.append)
+    return readings, consumed
+
+
+def write_influx_temps(temps, time_ns):
+    """Write a 4-channel temperature reading taken at time_ns to InfluxDB."""
     if not _influx:
         return
-    from influxdb_client import Point, WritePrecision
-
-    point = Point(_influx["measurement"])
-    has_fields = False
-    for i, t in enumerate(temps, 1):
-        if t is not None:
-            point = point.field(f"t{i}", t)
-            has_fields = True
-    if not has_fields:
+    fields = ",".join(f"t{i}={t}" for i, t in enumerate(temps, 1) if t is not None)
+    if not fields:
         return  # all channels open/disconnected — nothing to write
-    point = point.time(datetime.datetime.now(datetime.timezone.utc), WritePrecision.MILLISECONDS)
     try:
         _influx["write_api"].write(
             bucket=_influx["bucket"],
             org=_influx["org"],
-            record=point,
+            record=f"{_influx['line_prefix']}{fields} {time_ns}",
+            write_precision=WritePrecision.NS,
         )
     except Exception as e:
         if not _tui_active:
             print(f"  InfluxDB write error: {e}")
 
 
+def enqueue_influx_temps(temps):
+    """Queue a reading for influx_consumer(), dropping the oldest if full.
+
+    The timestamp is taken here, on receipt, so queue lag doesn't shift it.
+    """
+    item = (time.time_ns(), temps)
+    try:
+        _influx_q.put_nowait(item)
+    except asyncio.QueueFull:
+        _influx_q.get_nowait()
+        _influx_q.put_nowait(item)
+
+
+async def influx_consumer(queue):
+    """Drain queued readings into InfluxDB off the serial→WebSocket path."""
+    while True:
+        time_ns, temps = await queue.get()
+        write_influx_temps(temps, time_ns)
+        queue.task_done()
+        await asyncio.sleep(0)  # let the forwarder run between writes
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # TRANSPORT HANDLERS
 # ─────────────────────────────────────────────────────────────────────────────
 
+def _dispatch_reading(temps):
+    """Hand one parsed reading to the TUI and the InfluxDB queue."""
+    tui_update_reading(temps)
+    if _influx_q is not None:
+        enqueue_influx_temps(temps)
+
+
+def _serial_reader(ser, loop, queue, stop):
+    """Blocking serial read loop, run on a dedicated thread per connection.
+
+    Hands each chunk to the event loop via call_soon_threadsafe. Whatever
+    exception ends the loop is handed over the same way, so serial_to_ws
+    never waits on a dead thread. Exits once stop is set; the serial
+    timeout bounds how long that takes.
+    """
+    try:
+        while not stop.is_set():
+            # Block for the first byte, then keep collecting until the line
+            # has been quiet for READ_SETTLE so a whole reply goes out as one
+            # WebSocket frame and one parser pass
+            data = ser.read(1)
+            while data and len(data) < READ_CHUNK:
+                time.sleep(READ_SETTLE)
+                # in_waiting can raise a bare OSError (EIO) on unplug
+                waiting = ser.in_waiting
+                if not waiting:
+                    break
+                data += ser.read(min(waiting, READ_CHUNK - len(data)))
+            if data:
+                loop.call_soon_threadsafe(queue.put_nowait, data)
+    except BaseException as e:
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+        except RuntimeError:
+            pass  # event loop closed
+
+
 async def serial_to_ws(ser, ws):
     """Read raw bytes from serial and forward as binary WebSocket frames."""
-    loop = asyncio.get_event_loop()
-    parse_buf = b""
-    while True:
-        try:
-            data = await loop.run_in_executor(None, ser.read, 256)
-        except serial.SerialException as e:
-            if not _tui_active:
-                print(f"\n  Serial read error: {e}")
-            return
-        if data:
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    stop = threading.Event()
+    reader = threading.Thread(target=_serial_reader,
+                              args=(ser, loop, queue, stop), daemon=True)
+    reader.start()
+    parse_buf = bytearray()
+    try:
+        while True:
+            data = await queue.get()
+            if isinstance(data, BaseException):
+                if not _tui_active:
+                    print(f"\n  Serial read error: {data}")
+                return
             try:
                 await ws.send(data)
             except websockets.ConnectionClosed:
                 return
-            # Always parse frames for TUI display and InfluxDB
-            parse_buf += data
-            readings, parse_buf = parse_ta612c_frames(parse_buf)
-            for temps in readings:
-                tui_update_reading(temps)
-                write_influx_temps(temps)
-        else:
-            await asyncio.sleep(0.05)
+            # Parse frames only when someone consumes readings (TUI display
+            # or InfluxDB); otherwise the bridge is a plain byte relay
+            if _tui_active or _influx_q is not None:
+                parse_buf.extend(data)
+                consumed = _scan_ta612c_frames(parse_buf, _dispatch_reading)
+                del parse_buf[:consumed]
+    finally:
+        stop.set()
 
 
 async def ws_to_serial(ser, ws):
     """Read binary WebSocket frames and write raw bytes to serial."""
     try:
         async for message in ws:
-            if isinstance(message, bytes) and message:
-                try:
-                    ser.write(message)
-                except serial.SerialException as e:
-                    if not _tui_active:
-                        print(f"\n  Serial write error: {e}")
-                    return
-            elif isinstance(message, str):
+            if isinstance(message, str):
                 # Fallback for text frames
-                try:
-                    ser.write(message.encode("ascii"))
-                except serial.SerialException as e:
-                    if not _tui_active:
-                        print(f"\n  Serial write error: {e}")
-                    return
+                message = message.encode("ascii")
+            if not message:
+                continue
+            if _LOG_TX:
+                print(f"  TX: {message.hex(' ')}")
+            try:
+                ser.write(message)
+            except serial.SerialException as e:
+                if not _tui_active:
+                    print(f"\n  Serial write error: {e}")
+                return
     except websockets.ConnectionClosed:
         pass
 
@@ -578,22 +689,60 @@ async def handler(ws, ser):
     """Handle a single WebSocket connection."""
     peer = getattr(ws, "remote_address", None)
     tui_update_client(peer, True)
+    tasks = [
+        asyncio.create_task(serial_to_ws(ser, ws)),
+        asyncio.create_task(ws_to_serial(ser, ws)),
+    ]
     try:
-        await asyncio.gather(
-            serial_to_ws(ser, ws),
-            ws_to_serial(ser, ws),
-        )
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
     finally:
+        # End both directions as soon as either does: a closed socket must
+        # also stop serial_to_ws and its reader thread, since the device
+        # goes silent once the browser stops polling
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
         tui_update_client(peer, False)
+    for task in done:
+        task.result()  # re-raise unexpected errors for websockets to log
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # MAIN
 # ─────────────────────────────────────────────────────────────────────────────
 
+def parse_args():
+    """Parse bridge command-line options."""
+    parser = argparse.ArgumentParser(
+        description="WebSocket ↔ Serial bridge for TA612C thermocouple logger.")
+    parser.add_argument("port", nargs="?",
+                        help="serial port (default: auto-detect)")
+    parser.add_argument("--no-crc", action="store_true",
+                        help="skip frame checksum validation when parsing "
+                             "readings for the TUI/InfluxDB; saves CPU on a "
+                             "known-good USB link, but corrupted frames may "
+                             "be logged as bogus temperatures")
+    parser.add_argument("--verbose", action="store_true",
+                        help="log bytes sent to the device as hex "
+                             "(disables the TUI)")
+    parser.add_argument("--no-influx", action="store_true",
+                        help="skip the InfluxDB logging prompt")
+    parser.add_argument("--ws-port", type=int, default=WS_PORT,
+                        help=f"WebSocket port (default: {WS_PORT}, the "
+                             "web app's default)")
+    return parser.parse_args()
+
+
 async def main():
-    if len(sys.argv) > 1:
-        port_name = sys.argv[1]
+    global _influx_q, _influx_task, _VERIFY_CHECKSUM, _LOG_TX, WS_PORT
+
+    args = parse_args()
+    _VERIFY_CHECKSUM = not args.no_crc
+    _LOG_TX = args.verbose
+    WS_PORT = args.ws_port
+
+    if args.port:
+        port_name = args.port
     elif SERIAL_PORT:
         port_name = SERIAL_PORT
         print(f"Using pre-configured serial port: {port_name}")
@@ -608,15 +757,23 @@ async def main():
     ser = open_serial(port_name)
     print(f"Serial port opened: {ser.name}")
 
-    influx_cfg = setup_influxdb()
+    influx_cfg = None if args.no_influx else setup_influxdb()
     influx_desc = (f"enabled ({influx_cfg['measurement']})"
                    if influx_cfg else "disabled")
+    if influx_cfg:
+        _influx_q = asyncio.Queue(maxsize=1024)
+        _influx_task = asyncio.create_task(influx_consumer(_influx_q))
 
     print(f"Starting WebSocket server on ws://{WS_HOST}:{WS_PORT}")
     print("Web app can now connect via the Bridge button.\n")
-    tui_start(f"serial: {ser.name}", influx_desc)
-
-    async with websockets.serve(lambda ws: handler(ws, ser), WS_HOST, WS_PORT):
+    if not _LOG_TX:
+        tui_start(f"serial: {ser.name}", influx_desc)
+
+    # Frames are small binary chunks: skip permessage-deflate (browsers
+    # fall back to uncompressed frames when the server doesn't accept it)
+    async with websockets.serve(lambda ws: handler(ws, ser), WS_HOST, WS_PORT,
+                                compression=None, max_size=2**20,
+                                write_limit=2**20):
         await asyncio.Future()  # run forever
 
 
@@ -11,14 +11,68 @@ Usage:
     open http://localhost:8000
 """
 import http.server
+import io
 import os
+import stat
 import webbrowser
 from functools import partial
 
 PORT = 8000
 ROOT = os.path.dirname(os.path.abspath(__file__))
-handler = partial(http.server.SimpleHTTPRequestHandler, directory=ROOT)
-server = http.server.HTTPServer(("", PORT), handler)
+CACHE_MAX = 1 << 20  # only keep files up to 1 MB in memory
+
+
+class CachedHandler(http.server.SimpleHTTPRequestHandler):
+    """Serve small files from an in-memory cache with ETag revalidation.
+
+    Entries are keyed by path and invalidated when the file's mtime or size
+    changes, so edits show up on the next reload.
+    """
+
+    _cache = {}  # path -> (mtime_ns, size, etag, bytes)
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if path.endswith("/"):
+            # Directory URL: serve its index.html from the cache when present
+            path = os.path.join(path, "index.html")
+        try:
+            st = os.stat(path)
+        except OSError:
+            return super().send_head()
+        if not stat.S_ISREG(st.st_mode) or st.st_size > CACHE_MAX:
+            return super().send_head()
+
+        entry = self._cache.get(path)
+        if entry is None or entry[:2] != (st.st_mtime_ns, st.st_size):
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+            except OSError:
+                return super().send_head()
+            etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+            entry = (st.st_mtime_ns, st.st_size, etag, data)
+            self._cache[path] = entry
+        etag, data = entry[2], entry[3]
+
+        if etag in self.headers.get("If-None-Match", ""):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return None
+
+        self.send_response(200)
+        self.send_header("Content-type", self.guess_type(path))
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")  # always revalidate
+        self.send_header("Last-Modified", self.date_time_string(st.st_mtime))
+        self.end_headers()
+        return io.BytesIO(data)
+
+
+handler = partial(CachedHandler, directory=ROOT)
+server = http.server.ThreadingHTTPServer(("", PORT), handler)
 print(f"Serving {ROOT} at http://localhost:{PORT}")
 webbrowser.open(f"http://localhost:{PORT}")
 server.serve_forever()